@@ -16,30 +16,32 @@ __version__ = '2.16.0'
 IS_VIRTUAL = os.environ.get('MAI_IS_VIRTUAL', 'False').lower() in ['true', 't', '1', 'yes', 'y']
 
 
+_aa_console_print = None
+
+
 def print_all(*args, **kwargs):
     """
     Prints to both standard out (as the build-in `print` does by default), and
     also prints to the AutoAuto console!
     """
-    from auto.console import print as aa_console_print
-    aa_console_print(*args, **kwargs)
+    global _aa_console_print
+    if _aa_console_print is None:
+        # Imported lazily (and only once) since `auto.console` is heavy.
+        from auto.console import print as aa_console_print
+        _aa_console_print = aa_console_print
+    _aa_console_print(*args, **kwargs)
     print(*args, **kwargs)
 
 
-def _ctx_print_all(*args, **kwargs):
-    """
-    This function does `print_all` on regular devices,
-    but prints only to stdout on virtual devices.
-
-    Why? Because we don't want so much printing to the
-    "console" on virtual devices, since virtual devices
-    don't have a standard LCD screen for the console UI,
-    thus printing to the console on virtual devices is
-    more "in your face" and can be distracting if we print
-    too much to it.
-    """
-    if IS_VIRTUAL:
-        print(*args, **kwargs)
-    else:
-        print_all(*args, **kwargs)
-
+# `_ctx_print_all` does `print_all` on regular devices,
+# but prints only to stdout on virtual devices.
+#
+# Why? Because we don't want so much printing to the
+# "console" on virtual devices, since virtual devices
+# don't have a standard LCD screen for the console UI,
+# thus printing to the console on virtual devices is
+# more "in your face" and can be distracting if we print
+# too much to it.
+#
+# `IS_VIRTUAL` never changes, so we choose once, here.
+_ctx_print_all = print if IS_VIRTUAL else print_all
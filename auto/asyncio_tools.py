@@ -30,14 +30,29 @@ async methods. See `wrap_async_to_sync()`.
 import asyncio
 import inspect
 import functools
-from threading import Thread, RLock
+from types import FunctionType, MethodType
+from threading import Thread, RLock, Event, get_ident
+from concurrent.futures import ThreadPoolExecutor
 
 from auto.rpc.serialize_interface import serialize_interface
 from auto.rpc.build_interface import build_interface
 
+try:
+    # uvloop is a libuv-backed drop-in event loop which dispatches callbacks
+    # in C; it makes each sync-over-async call (see `wrap_async_to_sync()`)
+    # cheaper. It is optional; we fall back to the stock loop without it.
+    import uvloop
+    _LOOP_FACTORY = uvloop.new_event_loop
+except ImportError:
+    _LOOP_FACTORY = asyncio.new_event_loop
+
 
 DEBUG_ASYNCIO = False
 
+# The background loop and the ident of the thread running it, set (as one
+# tuple) by `get_loop()`; see `_assert_not_on_loop_thread()`.
+_BG_LOOP_THREAD = (None, None)
+
 
 def thread_safe(wrapped=None, lock=None):
     if wrapped is None:
@@ -58,24 +73,75 @@ def get_loop():
     The loop (and its background thread) are not created until you invoke this
     function for the first time. The same loop is returned on all subsequent calls.
     """
-    global _BG_LOOP
+    global _BG_LOOP, _BG_LOOP_THREAD
     try:
         return _BG_LOOP
     except NameError:
-        _BG_LOOP = asyncio.new_event_loop()
-        _set_async_debug_and_log_level(_BG_LOOP)
-        thread = Thread(target=_loop_main, args=(_BG_LOOP,))
-        thread.daemon = True  # <-- thread will exit when main thread exists
-        thread.start()
-        _setup_cleanup(_BG_LOOP, thread)
+        if hasattr(asyncio, 'Runner'):
+            # Python 3.11+: Let an `asyncio.Runner` own the loop, so that it
+            # can be shut down cleanly (see `_runner_main()`).
+            ready = Event()
+            loop_holder = []
+            thread = Thread(target=_runner_main, args=(loop_holder, ready), name='libauto-loop')
+            thread.daemon = True  # <-- thread will exit when main thread exists
+            thread.start()
+            ready.wait()
+            if isinstance(loop_holder[0], BaseException):
+                raise loop_holder[0]   # <-- the loop failed to start (see `_runner_main()`); a later call will retry
+            _BG_LOOP = loop_holder[0]
+            _BG_LOOP_THREAD = (_BG_LOOP, thread.ident)
+            _setup_runner_cleanup(_BG_LOOP, thread)
+        else:
+            _BG_LOOP = _LOOP_FACTORY()
+            _configure_loop(_BG_LOOP)
+            thread = Thread(target=_loop_main, args=(_BG_LOOP,), name='libauto-loop')
+            thread.daemon = True  # <-- thread will exit when main thread exists
+            thread.start()
+            _BG_LOOP_THREAD = (_BG_LOOP, thread.ident)
+            _setup_cleanup(_BG_LOOP, thread)
         return _BG_LOOP
 
 
+def submit(coro):
+    """
+    Schedule the coroutine `coro` on the background loop (see `get_loop()`)
+    without waiting for it. A `concurrent.futures.Future` is returned, so you
+    may wait for the coroutine's result later if you wish.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
 def _loop_main(loop):
     asyncio.set_event_loop(loop)
     loop.run_forever()
 
 
+def _runner_main(loop_holder, ready):
+    try:
+        with asyncio.Runner(loop_factory=_LOOP_FACTORY) as runner:
+            loop = runner.get_loop()
+            _configure_loop(loop)
+            loop_holder.append(loop)
+            ready.set()
+            loop.run_forever()
+    except BaseException as e:
+        if ready.is_set():
+            raise
+        # `get_loop()` is waiting on us, so hand it the error rather than
+        # leaving it (and every later caller) blocked forever.
+        loop_holder.append(e)
+        ready.set()
+    # Exiting the `with` block cancels any remaining tasks, shuts down async
+    # generators and the default executor, then closes the loop.
+
+
+def _configure_loop(loop):
+    _set_async_debug_and_log_level(loop)
+    # The default executor would size itself by CPU count; that's more idle
+    # threads than this loop ever needs on our small devices.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=2, thread_name_prefix='libauto-bg'))
+
+
 def _set_async_debug_and_log_level(loop):
     # Do you want debugging turned on?
     if DEBUG_ASYNCIO:
@@ -114,6 +180,20 @@ def _setup_cleanup(loop, thread):
     atexit.register(cleanup)
 
 
+def _setup_runner_cleanup(loop, thread):
+    """
+    Stop the `asyncio.Runner`-owned loop at exit, which lets the runner close
+    it properly. We wait only briefly, so that a stuck task or executor job
+    cannot keep the process from exiting.
+    """
+    def cleanup():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1.0)
+
+    import atexit
+    atexit.register(cleanup)
+
+
 def wrap_async_to_sync(obj, loop=None):
     """
     Build and return an object which wraps `obj`, turning each of `obj`'s async
@@ -138,6 +218,37 @@ def wrap_async_to_sync(obj, loop=None):
     TheDynamicType.__module__ = typemodule
     TheDynamicType.__doc__ = typedoc
 
+    def batch(self, calls):
+        """
+        Invoke many of the wrapped async methods at once, blocking only
+        a single time until they have *all* finished. The `calls` are
+        given as `(method_name, args)` pairs; the list of return values
+        is returned (in the same order as `calls`).
+        """
+        _assert_not_on_loop_thread(loop)
+
+        # Check every method up front, so that nothing runs if any one of them is synchronous.
+        calls = [(getattr(obj, name), name, args) for name, args in calls]
+        for method, name, _ in calls:
+            if not inspect.iscoroutinefunction(method):
+                raise TypeError(f'Expected an async method, but {name!r} is synchronous')
+
+        async def _gather():
+            # The coroutines are built here, on the loop, only once the checks above have passed.
+            coros = []
+            try:
+                for method, _, args in calls:
+                    coros.append(method(*args))
+            except BaseException:
+                _close_coros(coros)   # <-- else each would warn that it was never awaited
+                raise
+            return await asyncio.gather(*coros)
+
+        future = asyncio.run_coroutine_threadsafe(_gather(), loop)
+        return future.result()
+
+    TheDynamicType.batch = batch   # <-- a method named `batch` on `obj` will override this one, below
+
     instance = TheDynamicType()
 
     for attr_name in dir(obj):
@@ -147,7 +258,7 @@ def wrap_async_to_sync(obj, loop=None):
 
         attr = getattr(obj, attr_name)
 
-        if not inspect.isfunction(attr) and not inspect.ismethod(attr):
+        if not isinstance(attr, (FunctionType, MethodType)):
             # We only care about functions and methods.
             continue
 
@@ -176,11 +287,65 @@ def wrap_async_to_sync(obj, loop=None):
     return instance
 
 
+def call_batch(coros, loop=None):
+    """
+    Run the given coroutines concurrently on the background loop (or on `loop`,
+    if given) and block until they are all done, returning a list of their
+    results. This costs one cross-thread handoff total, rather than one per
+    coroutine as you'd get by calling each through a synchronous wrapper.
+    """
+    if loop is None:
+        loop = get_loop()
+
+    coros = list(coros)
+
+    try:
+        _assert_not_on_loop_thread(loop)
+        _check_awaitables(coros)
+    except BaseException:
+        _close_coros(coros)   # <-- else each would warn that it was never awaited
+        raise
+
+    async def _gather():
+        return await asyncio.gather(*coros)
+
+    future = asyncio.run_coroutine_threadsafe(_gather(), loop)
+    return future.result()
+
+
+def _check_awaitables(coros):
+    for coro in coros:
+        if not inspect.isawaitable(coro):
+            raise TypeError(f'Expected a coroutine, got {coro!r} (is that method synchronous?)')
+
+
+def _close_coros(coros):
+    for coro in coros:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+
+
 def _closure_build_impl_transport(attr, loop):
     def impl_transport(path, args):
-        coro = attr(*args)
-        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        _assert_not_on_loop_thread(loop)
+        future = asyncio.run_coroutine_threadsafe(attr(*args), loop)
         return future.result()
 
     return impl_transport
 
+
+def _assert_not_on_loop_thread(loop):
+    bg_loop, bg_thread_id = _BG_LOOP_THREAD
+    if loop is bg_loop:
+        # The usual case: a plain ident comparison, with no exception raised
+        # (and caught) on every call as `asyncio.get_running_loop()` would.
+        on_loop_thread = (get_ident() == bg_thread_id)
+    else:
+        try:
+            on_loop_thread = (asyncio.get_running_loop() is loop)
+        except RuntimeError:
+            on_loop_thread = False
+    if on_loop_thread:
+        # Blocking on a future from within its own loop would deadlock the loop.
+        raise RuntimeError('Synchronous wrapper called from within its own event loop thread; `await` the async interface instead.')
+
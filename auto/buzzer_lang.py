@@ -12,6 +12,9 @@
 A small parser to be able to use the Buzzer language on the Fleet 2 and Virtual Cars.
 """
 
+import re
+import numpy as np
+
 NOTE_NAMES = ['C', 'D', 'E', 'F', 'G', 'A', 'B']
 LEN_MULTIPLIER = 2000
 TEMPO = 0
@@ -21,6 +24,16 @@ OCTAVE = 3
 DEFAULT_DURATION = 4
 DEFAULT_SETTINGS = [120, False, 127, 4, 4]
 
+# The record layout of `BuzzParser.convert_to_array()`'s output.
+# Rests have a `freq` of NaN and a `vel` of 0.
+NOTE_DTYPE = np.dtype([('freq', '<f4'), ('dur', '<f4'), ('vel', '<i2')])
+
+# Semitone offset of each note letter within an octave, indexed by `ord(letter) - ord('A')`.
+_NOTE_PITCHES = (9, 11, 0, 2, 4, 5, 7)
+
+# Frequency (in Hz) of every MIDI note number, computed once at import time.
+_FREQ_TABLE = tuple((2 ** ((n - 69) / 12.0)) * 440 for n in range(128))
+
 ## CMD TYPES:
 ## 0: note
 ## 1: octave
@@ -36,22 +49,35 @@ class BuzzParser:
         self.config = [*DEFAULT_SETTINGS]
 
     def get_note(self, note_letter, octave, accidentals):
-        note_pitches = {
-            'C': 0,
-            'D': 2,
-            'E': 4,
-            'F': 5,
-            'G': 7,
-            'A': 9,
-            'B': 11,
-        }
-        return 12 + (octave * 12) + note_pitches[note_letter] + accidentals
+        return 12 + (octave * 12) + _NOTE_PITCHES[ord(note_letter) - 65] + accidentals
 
     def get_freq(self, note_letter, octave, accidentals):
-        return (2 ** ((self.get_note(note_letter, octave, accidentals) - 69) / 12.0)) * 440
+        note = self.get_note(note_letter, octave, accidentals)
+        if 0 <= note < 128:
+            return _FREQ_TABLE[note]
+        # Outside the MIDI range (e.g. a huge `O` value); compute it directly.
+        return (2 ** ((note - 69) / 12.0)) * 440
 
     def calculate_note_duration(self, base_duration, num_dots):
-        return sum(base_duration / (2**i) for i in range(num_dots + 1))
+        # Each dot adds half of the previous addition: a geometric series.
+        return base_duration * (2.0 - 1.0 / (1 << num_dots))
+
+    def calculate_duration_ms(self, note_len, num_dots):
+        return self.calculate_note_duration(4 / note_len, num_dots) * (60 / (self.config[TEMPO]) * 1000)
+
+    def append_note(self, freq, duration_ms, velocity):
+        self.freqs.append(freq)
+        self.durations.append(duration_ms)
+        self.velocities.append(velocity)
+
+    @property
+    def notes(self):
+        """
+        The parsed notes as a list of `(freq, duration_ms, velocity)` tuples,
+        where `freq` and `velocity` are None for rests. Internally the notes
+        are stored column-wise, in `freqs`, `durations`, and `velocities`.
+        """
+        return list(zip(self.freqs, self.durations, self.velocities))
 
     def process_cmd(self):
         if self.cmd_type is None:
@@ -62,18 +88,14 @@ class BuzzParser:
                 note_len = int(self.args[1])
             except ValueError:
                 note_len = self.config[DEFAULT_DURATION]
-            t = self.calculate_note_duration(4 / note_len, self.args[4]) * (60 / (self.config[TEMPO]) * 1000)
-            self.notes.append((
+            t = self.calculate_duration_ms(note_len, self.args[4])
+            self.append_note(
                 self.get_freq(self.args[0], self.config[OCTAVE] + self.args[3], self.args[2]),
                 t / 2 if self.config[STACCATO] else t,
                 self.config[VELOCITY],
-            ))
+            )
             if self.config[STACCATO]:
-                self.notes.append((
-                    None,
-                    t / 2,
-                    None,
-                ))
+                self.append_note(None, t / 2, None)
             self.total_ms += t
         elif self.cmd_type == 1:
             self.config[OCTAVE] = int(self.args[1])
@@ -91,73 +113,150 @@ class BuzzParser:
                 rest_len = int(self.args[1])
             except ValueError:
                 rest_len = self.config[DEFAULT_DURATION]
-            t = self.calculate_note_duration(4 / rest_len, self.args[4]) * (60 / (self.config[TEMPO]) * 1000)
-            self.notes.append((
-                None,
-                t,
-                None,
-            ))
+            t = self.calculate_duration_ms(rest_len, self.args[4])
+            self.append_note(None, t, None)
             self.total_ms += t
         self.args.clear()
 
     def convert(self, notes_str):
-        self.notes = []
+        self.parse(notes_str)
+        return self.notes, self.total_ms / 1000
+
+    def convert_to_array(self, notes_str):
+        """
+        Like `convert()`, but the notes are returned as a structured ndarray
+        (see `NOTE_DTYPE`) rather than as a list of tuples.
+        """
+        self.parse(notes_str)
+        notes = np.empty(len(self.freqs), dtype=NOTE_DTYPE)
+        notes['freq'] = [np.nan if f is None else f for f in self.freqs]
+        notes['dur'] = self.durations
+        notes['vel'] = [0 if v is None else v for v in self.velocities]
+        return notes, self.total_ms / 1000
+
+    def parse(self, notes_str):
+        self.freqs = []
+        self.durations = []
+        self.velocities = []
         self.total_ms = 0
         self.cmd_type = None
         self.args = []
-        octave_diff = 0
-        for c in notes_str.upper():
-            if c == '!':
-                self.config = [*DEFAULT_SETTINGS]
-            elif c in NOTE_NAMES:
-                self.process_cmd()
-                self.cmd_type = 0
-                self.args = [c, '', 0, octave_diff, 0]
-                octave_diff = 0
-            elif c == 'O':
-                self.process_cmd()
-                self.cmd_type = 1
-                self.args = [None, '']
-            elif c == 'T':
-                self.process_cmd()
-                self.cmd_type = 2
-                self.args = [None, '']
-            elif c == 'L':
-                if self.cmd_type == 5:
-                    self.config[STACCATO] = False
-                    self.cmd_type = None
-                else:
-                    self.process_cmd()
-                    self.cmd_type = 3
-                    self.args = [None, '']
-            elif c == 'V':
-                self.process_cmd()
-                self.cmd_type = 4
-                self.args = [None, '']
-            elif c == 'M':
-                self.process_cmd()
-                self.cmd_type = 5
-            elif c == 'S' and self.cmd_type == 5:
-                self.config[STACCATO] = True
-                self.cmd_type = None
-            elif c == 'R':
-                self.process_cmd()
-                self.cmd_type = 6
-                self.args = [None, '', None, None, 0]
-            elif c.isnumeric():
-                if len(self.args) >= 2:
-                    self.args[1] += c
-            elif c == '>':
-                octave_diff = 1
-            elif c == '<':
-                octave_diff = -1
-            elif (c == '+' or c == '#') and self.cmd_type == 0:
-                self.args[2] += 1
-            elif c == '-' and self.cmd_type == 0:
-                self.args[2] -= 1
-            elif c == '.' and (self.cmd_type == 0 or self.cmd_type == 6):
-                self.args[4] += 1
+        self.octave_diff = 0
+        handlers = _HANDLERS
+        for token in _TOKEN_RE.findall(notes_str.upper()):
+            handlers[token[0]](self, token)
 
         self.process_cmd()
 
-        return self.notes, self.total_ms / 1000
+
+## Matches each meaningful token of the (upper-cased) input. Digits come as
+## whole runs; every other token is a single character. Anything else is ignored.
+_TOKEN_RE = re.compile(r'[0-9]+|[!A-GORTLVMS<>+#\-.]')
+
+
+## Per-token handlers used by `BuzzParser.convert()`. Each takes the parser
+## and the token; see `_HANDLERS` for the dispatch table (keyed on the token's
+## first character).
+
+def _handle_reset(parser, c):
+    parser.config = [*DEFAULT_SETTINGS]
+
+
+def _handle_note(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 0
+    parser.args = [c, '', 0, parser.octave_diff, 0]
+    parser.octave_diff = 0
+
+
+def _handle_octave(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 1
+    parser.args = [None, '']
+
+
+def _handle_tempo(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 2
+    parser.args = [None, '']
+
+
+def _handle_length(parser, c):
+    if parser.cmd_type == 5:
+        parser.config[STACCATO] = False
+        parser.cmd_type = None
+    else:
+        parser.process_cmd()
+        parser.cmd_type = 3
+        parser.args = [None, '']
+
+
+def _handle_velocity(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 4
+    parser.args = [None, '']
+
+
+def _handle_mode(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 5
+
+
+def _handle_staccato(parser, c):
+    if parser.cmd_type == 5:
+        parser.config[STACCATO] = True
+        parser.cmd_type = None
+
+
+def _handle_rest(parser, c):
+    parser.process_cmd()
+    parser.cmd_type = 6
+    parser.args = [None, '', None, None, 0]
+
+
+def _handle_digits(parser, digits):
+    if len(parser.args) >= 2:
+        parser.args[1] += digits
+
+
+def _handle_octave_up(parser, c):
+    parser.octave_diff = 1
+
+
+def _handle_octave_down(parser, c):
+    parser.octave_diff = -1
+
+
+def _handle_sharp(parser, c):
+    if parser.cmd_type == 0:
+        parser.args[2] += 1
+
+
+def _handle_flat(parser, c):
+    if parser.cmd_type == 0:
+        parser.args[2] -= 1
+
+
+def _handle_dot(parser, c):
+    if parser.cmd_type == 0 or parser.cmd_type == 6:
+        parser.args[4] += 1
+
+
+_HANDLERS = {
+    '!': _handle_reset,
+    **{c: _handle_note for c in NOTE_NAMES},
+    'O': _handle_octave,
+    'T': _handle_tempo,
+    'L': _handle_length,
+    'V': _handle_velocity,
+    'M': _handle_mode,
+    'S': _handle_staccato,
+    'R': _handle_rest,
+    **{c: _handle_digits for c in '0123456789'},
+    '>': _handle_octave_up,
+    '<': _handle_octave_down,
+    '+': _handle_sharp,
+    '#': _handle_sharp,
+    '-': _handle_flat,
+    '.': _handle_dot,
+}
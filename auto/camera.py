@@ -17,7 +17,7 @@ This is a **synchronous** interface.
 
 import os
 import cv2
-import base64
+import binascii
 import numpy as np
 
 import auto
@@ -25,13 +25,46 @@ from auto.asyncio_tools import thread_safe, RLock
 from auto.capabilities import list_caps, acquire, release
 from auto import IS_VIRTUAL
 
+# libjpeg-turbo (through either simplejpeg or PyTurboJPEG) encodes RGB and
+# grayscale frames directly, with SIMD, so when it is available we can skip
+# the RGB->BGR conversion that cv2 requires. Both packages are optional.
+# `_encode_jpeg()` takes a contiguous HxWx3 (RGB) or HxWx1 (grayscale) frame.
+try:
+    import simplejpeg
+
+    def _encode_jpeg(frame):
+        colorspace = 'RGB' if frame.shape[2] == 3 else 'GRAY'
+        return simplejpeg.encode_jpeg(frame, quality=50, colorspace=colorspace)
+
+except ImportError:
+    try:
+        from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_GRAY, TJSAMP_GRAY
+        _TURBO_JPEG = TurboJPEG()
+
+        def _encode_jpeg(frame):
+            if frame.shape[2] == 3:
+                return _TURBO_JPEG.encode(frame, quality=50, pixel_format=TJPF_RGB)
+            return _TURBO_JPEG.encode(frame, quality=50, pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+
+    except (ImportError, RuntimeError, OSError):
+        # RuntimeError/OSError: the package is there, but not libturbojpeg.
+        _encode_jpeg = None
+
+# pybase64 dispatches to SIMD (SSSE3/AVX2/NEON) kernels, and can build the
+# output `str` directly; it's optional too.
+try:
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    def _b64encode_str(img):
+        return binascii.b2a_base64(img, newline=False).decode('ascii')
+
 
 class _CameraRGB:
     def __init__(self, camera):
         self._camera = camera
         self.frame_index = 0
         self.text_scale = 0.75
-        self.text_color = [255, 255, 255]
+        self.text_color = (255, 255, 255)
         self.text_line_width = 2
 
     def capture(self):
@@ -104,7 +137,12 @@ def capture(num_frames=1, verbose=False):
     camera = global_camera(verbose)
 
     if num_frames > 1:
-        frames = np.array([frame for _, frame in zip(range(num_frames), camera.stream())])
+        stream = camera.stream()
+        first_frame = next(stream)
+        frames = np.empty((num_frames,) + first_frame.shape, dtype=first_frame.dtype)
+        frames[0] = first_frame
+        for i in range(1, num_frames):
+            frames[i] = next(stream)
         if verbose:
             auto._ctx_print_all("Captured {} frames.".format(num_frames))
         return frames
@@ -117,43 +155,57 @@ def capture(num_frames=1, verbose=False):
 
 def draw_frame_index(frame, index,
                      text_scale=0.75,
-                     text_color=[255, 255, 255],
+                     text_color=(255, 255, 255),
                      text_line_width=2):
-    text = "frame {}".format(index)
-    x = 5
-    y = frame.shape[0] - 5
     cv2.putText(frame,
-                text,
-                (x, y),
+                f"frame {index}",
+                (5, frame.shape[0] - 5),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 text_scale,
                 text_color,
                 text_line_width)
 
 
+# Frames with at most this many pixels are sent as BMPs by `base64_encode_image()`.
+_BMP_MAX_PIXELS = 64 * 64
+
+
 def base64_encode_image(frame):
     """
     Encodes an image buffer (an ndarray) as a base64 encoded string.
     """
     if frame.ndim == 2:
-        frame = np.expand_dims(frame, axis=2)
-        assert frame.ndim == 3 and frame.shape[2] == 1
+        pass  # grayscale; cv2.imencode takes 2D frames as-is
     elif frame.ndim == 3:
-        if frame.shape[2] == 1:
-            pass # all good
-        elif frame.shape[2] == 3:
-            # cv2.imencode expects a BGR image:
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            assert frame.ndim == 3 and frame.shape[2] == 3
-        else:
+        if frame.shape[2] not in (1, 3):
             raise Exception("invalid number of channels")
     else:
         raise Exception("invalid frame ndarray ndim")
+    if frame.shape[0] * frame.shape[1] <= _BMP_MAX_PIXELS:
+        # For tiny frames the fixed cost of compressing outweighs the few bytes
+        # it saves, so we send an (uncompressed) BMP, which browsers display.
+        if frame.ndim == 3 and frame.shape[2] == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        bmp_img = cv2.imencode('.bmp', frame)[1]
+        return _to_data_url('data:image/bmp;base64,', bmp_img)
+    if not IS_VIRTUAL and _encode_jpeg is not None:
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+        jpg_img = _encode_jpeg(np.ascontiguousarray(frame))
+        return _to_data_url('data:image/jpeg;base64,', jpg_img)
+    if frame.ndim == 3 and frame.shape[2] == 3:
+        # cv2.imencode expects a BGR image:
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
     if IS_VIRTUAL:
-        png_img = cv2.imencode('.png', frame, [cv2.IMWRITE_PNG_COMPRESSION, 6])[1].tobytes()
-        base64_img = 'data:image/png;base64,' + base64.b64encode(png_img).decode('ascii')
+        png_img = cv2.imencode('.png', frame, [cv2.IMWRITE_PNG_COMPRESSION, 6])[1]
+        base64_img = _to_data_url('data:image/png;base64,', png_img)
     else:
-        jpg_img = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 50])[1].tobytes()
-        base64_img = 'data:image/jpeg;base64,' + base64.b64encode(jpg_img).decode('ascii')
+        jpg_img = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 50])[1]
+        base64_img = _to_data_url('data:image/jpeg;base64,', jpg_img)
     return base64_img
 
+
+def _to_data_url(prefix, img):
+    # `img` may be any contiguous buffer (e.g. the ndarray from cv2.imencode),
+    # so there's no need to copy it into `bytes` first.
+    return prefix + _b64encode_str(img)
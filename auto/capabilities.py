@@ -28,10 +28,10 @@ def list_caps():
     by passing the capability's string label to the function
     `acquire()`.
     """
-    global _CAPABILITIES_MAP
+    global _CAPABILITIES_MAP, _CAPABILITIES_TUPLE
 
     try:
-        return tuple(sorted(_CAPABILITIES_MAP.keys()))
+        return _CAPABILITIES_TUPLE
 
     except NameError:
         pass  # We can remedy this.
@@ -40,15 +40,32 @@ def list_caps():
 
     controller_connection = CioRoot(loop)
 
-    _CAPABILITIES_MAP = {}
+    capabilities_map = {}
 
     for capability_id in controller_connection.init():
-        _CAPABILITIES_MAP[capability_id] = {
+        capabilities_map[capability_id] = {
                 'acquire': controller_connection.acquire,
                 'release': controller_connection.release,
         }
 
-    return tuple(sorted(_CAPABILITIES_MAP.keys()))
+    # Only publish the map once it is complete, since `_get_capability()` reads it without the lock.
+    _CAPABILITIES_MAP = capabilities_map
+    _CAPABILITIES_TUPLE = tuple(sorted(capabilities_map.keys()))
+
+    return _CAPABILITIES_TUPLE
+
+
+def _get_capability(capability_name):
+    """
+    Return the `_CAPABILITIES_MAP` entry for `capability_name`,
+    or None if there is no such capability.
+    """
+    try:
+        capabilities_map = _CAPABILITIES_MAP
+    except NameError:
+        list_caps()
+        capabilities_map = _CAPABILITIES_MAP
+    return capabilities_map.get(capability_name)
 
 
 def acquire(capability_name):
@@ -59,9 +76,10 @@ def acquire(capability_name):
     (when you are done using it) by passing it to the function
     `release()`.
     """
-    if capability_name not in list_caps():
+    capability = _get_capability(capability_name)
+    if capability is None:
         raise AttributeError("The given capability name (\"{}\") is not available.".format(capability_name))
-    iface = _CAPABILITIES_MAP[capability_name]['acquire'](capability_name)
+    iface = capability['acquire'](capability_name)
     iface._capability_name = capability_name
     return iface
 
@@ -75,7 +93,7 @@ def release(capability_iface):
     capability_name = getattr(capability_iface, "_capability_name", None)
     if capability_name is None:
         raise Exception("The object passed as `capability_iface` was not acquired by `acquire()`; you must pass the exact object obtained from `acquire()`.")
-    if capability_name not in list_caps():
+    capability = _get_capability(capability_name)
+    if capability is None:
         raise Exception("The given capability name (\"{}\") is not available.".format(capability_name))
-    return _CAPABILITIES_MAP[capability_name]['release'](capability_iface)
-
+    return capability['release'](capability_iface)
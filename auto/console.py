@@ -17,20 +17,24 @@ This is a **synchronous** interface.
 from auto.asyncio_tools import get_loop, thread_safe
 from auto.services.console.client_sync import CuiRoot
 
-_built_in_print = print
+
+_CONSOLE = None
 
 
-@thread_safe
 def _get_console():
+    console = _CONSOLE
+    if console is None:
+        console = _init_console()
+    return console
+
+
+@thread_safe
+def _init_console():
     global _CONSOLE
-    try:
-        return _CONSOLE
-    except:
-        pass   # we can fix this
-
-    loop = get_loop()
-    _CONSOLE = CuiRoot(loop)
-    _CONSOLE.init()
+    if _CONSOLE is None:
+        console = CuiRoot(get_loop())
+        console.init()
+        _CONSOLE = console   # <-- only publish it once it's ready, since `_get_console()` doesn't take the lock
     return _CONSOLE
 
 
@@ -40,16 +44,12 @@ def print(*objects, sep=' ', end='\n'):
     as the build-in `print()` function in Python, but it prints
     to the AutoAuto console instead of to `stdout`.
     """
-    all_text = []
-    class Writable:
-        def write(self, text):
-            all_text.append(text)
-        def flush(self):
-            pass
-    ret = _built_in_print(*objects, sep=sep, end=end, file=Writable())
-    full_text = ''.join(all_text)
+    if sep is None:
+        sep = ' '    # <-- same defaults as the built-in `print()`
+    if end is None:
+        end = '\n'
+    full_text = sep.join(map(str, objects)) + end
     _get_console().write_text(full_text)
-    return ret
 
 
 def write_text(text):
@@ -95,9 +95,12 @@ def stream_image(rect_vals, shape, image_buf):
     Steam an image buffer (`image_buf` to the AutoAuto console, specifying
     where it should show up via the `rect_vals` variable. A special
     `rect_vals` of `(0, 0, 0, 0)` indicates that the image should be
-    full-screen. The `image_buf` should be either a grayscale or RGB image.
+    full-screen. The `image_buf` should be either a grayscale or RGB image,
+    given as `bytes` or any other contiguous buffer (e.g. a `memoryview`).
+    The `rect_vals` and `shape` may be lists or tuples (the RPC layer sends
+    both the same way).
     """
-    return _get_console().stream_image(tuple(rect_vals), tuple(shape), image_buf)
+    return _get_console().stream_image(rect_vals, shape, image_buf)
 
 
 def clear_image():
@@ -127,5 +130,5 @@ def clear():
 #    c = _get_console()
 #    c.close()
 #    global _CONSOLE
-#    del _CONSOLE
+#    _CONSOLE = None
 
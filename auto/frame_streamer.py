@@ -19,13 +19,39 @@ from auto import console
 from auto import _ctx_print_all
 from auto.labs import send_message_to_labs
 from auto.camera import base64_encode_image
+from auto import logger
 
 import cv2
+import functools
 import numpy as np
 import PIL.Image
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+# No terminal handler: this module runs in user programs and notebooks, so
+# only real failures (see `_labs_worker()`) should reach the user's output.
+log = logger.init(__name__, terminal=False)
 
 OPTIMAL_ASPECT_RATIO = 4/3
 
+# The `rect_vals` sentinel which means "full-screen" to `console.stream_image()`.
+_FULLSCREEN_RECT = (0, 0, 0, 0)
+
+# Frames are encoded and sent to Labs on this single background thread, so
+# that `stream()` does not block on JPEG encoding or the network. See `_send_to_labs()`.
+_LABS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='libauto-labs')
+_LABS_LOCK = Lock()
+_LABS_INFLIGHT = None   # <-- the future of the running `_labs_worker()`, if any
+_LABS_PENDING = None    # <-- a 1-tuple holding the next frame to send, if any
+
+# Reused by `_add_white_bars()` for the console path of `stream()`; guarded by `_BARS_LOCK`.
+_BARS_LOCK = Lock()
+_BARS_BUFFER = None
+
+# Reused by `_create_montage()` when `plot()` only streams the montage; guarded by `_MONTAGE_LOCK`.
+_MONTAGE_LOCK = Lock()
+_MONTAGE_BUFFER = None
+
 
 def plot(frames, also_stream=True, verbose=False):
     """
@@ -59,17 +85,29 @@ def plot(frames, also_stream=True, verbose=False):
         n = frames.shape[0]
         _ctx_print_all("Plotting {} frame{}...".format(n, 's' if n != 1 else ''))
 
-    montage = _create_montage(frames)
-
-    if also_stream:
-        stream(montage, to_labs=True, verbose=False)
-
-    return PIL.Image.fromarray(np.squeeze(montage)) if _in_notebook() else None
-
-
+    if _in_notebook():
+        # INTER_AREA gives the nicest downscale, which is worth it for a figure that
+        # will be displayed. The returned image may share the montage's memory, so
+        # the montage must be freshly allocated.
+        montage = _create_montage(frames, cv2.INTER_AREA)
+        if also_stream:
+            stream(montage, to_labs=True, verbose=False)
+        return PIL.Image.fromarray(np.squeeze(montage))
+
+    # Here the montage is only a streamed preview, so INTER_LINEAR (much cheaper)
+    # will do, and the montage buffer can be reused from call to call.
+    with _MONTAGE_LOCK:
+        montage = _create_montage(frames, cv2.INTER_LINEAR, reuse_buffer=True)
+        if also_stream:
+            stream(montage, to_labs=True, verbose=False)
+    return None
+
+
+@functools.lru_cache(maxsize=1)
 def _in_notebook():
     """
     Determine if the current process is running in a jupyter notebook / iPython shell
+    (this cannot change during the life of the process, so the answer is cached)
     Returns: boolean
     """
     try:
@@ -85,10 +123,10 @@ def _in_notebook():
     return result
 
 
-def _create_montage(frames):
+def _create_montage(frames, interpolation=cv2.INTER_AREA, reuse_buffer=False):
     """
     Stitch together all frames into 1 montage image:
-    Each frame shape is (height x width x channels).
+    Each frame shape is (height x width x channels), or (height x width) for gray frames.
 
     Only supports 1 to 4 frames:
         frame_count | result
@@ -99,38 +137,41 @@ def _create_montage(frames):
 
     Args:
         frames: nd-array or list of nd-arrays
+        interpolation: the cv2 interpolation used to shrink the frames
+        reuse_buffer: if True, the montage is written into the `_MONTAGE_BUFFER`,
+                      which will be overwritten by the next such call
 
-    Returns: nd-array of shape (row_count * frame_height, column_count * frame_width, channels)
+    Returns: nd-array of shape (row_count * frame_height, column_count * frame_width[, channels])
     """
-    n = frames.shape[0]
+    global _MONTAGE_BUFFER
+    frames = np.asarray(frames)   # <-- no copy when `frames` is already an nd-array
+    n = len(frames)
     if n > 4:
         raise NotImplementedError("currently you may only montage up to 4 frames")
     MAX_COLS = 2
-    frames = np.array(frames)
     if n == 1:
         montage = frames[0]
     else:
-        frames = [_shrink_img(frame, factor=1/MAX_COLS) for frame in frames]
-        rows_of_frames = [frames[i:i+MAX_COLS] for i in range(0, len(frames), MAX_COLS)]
-        rows_of_combined_frames = [(np.hstack(row) if len(row) == MAX_COLS             # stitch frames together
-                                    else np.hstack([row[0], np.full_like(row[0],255)]) # stitch frame with white frame
-                                   ) for row in rows_of_frames]
-        montage = np.vstack(rows_of_combined_frames)
+        # Each frame is shrunk straight into its cell of the (preallocated) montage.
+        height, width = frames.shape[1:3]
+        channels = frames.shape[3:]   # <-- empty for 2-D (gray) frames, which then give a 2-D montage
+        cell_w, cell_h = width // MAX_COLS, height // MAX_COLS
+        n_rows = (n + MAX_COLS - 1) // MAX_COLS
+        montage_shape = (n_rows * cell_h, MAX_COLS * cell_w, *channels)
+        montage = _MONTAGE_BUFFER if reuse_buffer else None
+        if montage is None or montage.shape != montage_shape or montage.dtype != frames.dtype:
+            montage = np.empty(montage_shape, dtype=frames.dtype)
+            if reuse_buffer:
+                _MONTAGE_BUFFER = montage
+        for i, frame in enumerate(frames):
+            row, col = divmod(i, MAX_COLS)
+            cell = montage[row*cell_h:(row+1)*cell_h, col*cell_w:(col+1)*cell_w]
+            cv2.resize(frame, (cell_w, cell_h), dst=cell, interpolation=interpolation)
+        if n % MAX_COLS:
+            montage[-cell_h:, (n % MAX_COLS)*cell_w:] = 255   # <-- fill the unused cell(s) with white
     return montage
 
 
-def _shrink_img(img, factor=0.5):
-    """
-    Reduce the img dimensions to factor*100 percent.
-    Args:
-        img: nd-array with shape (height, width, channels)
-
-    Returns: nd-array with shape (height*factor, width*factor, channels)
-    """
-    shrunk_image = cv2.resize(img,None,fx=factor,fy=factor,interpolation=cv2.INTER_AREA)
-    return shrunk_image
-
-
 def stream(frame, to_console=True, to_labs=False, verbose=False):
     """
     Stream the given `frame` (a numpy ndarray) to your device's
@@ -147,44 +188,67 @@ def stream(frame, to_console=True, to_labs=False, verbose=False):
         if to_console:
             console.clear_image()
         if to_labs:
-            send_message_to_labs({'base64_img': ''})
+            _send_to_labs(None)
         return
 
+    if frame.ndim == 2:
+        frame = frame[:, :, np.newaxis]   # <-- a view; the frame is not copied
+    elif frame.ndim != 3:
+        raise Exception(f"invalid frame ndarray ndim: {frame.ndim}")
+    elif frame.shape[2] not in (1, 3):
+        raise Exception("invalid number of channels")
+
     # Publish the uncompressed frame to the console UI.
     if to_console:
-        if frame.ndim == 3:
-            if frame.shape[2] == 3:
-                pass  # all good
-            elif frame.shape[2] == 1:
-                pass  # all good
-            else:
-                raise Exception("invalid number of channels")
-        elif frame.ndim == 2:
-            frame = np.expand_dims(frame, axis=2)
-            assert frame.ndim == 3 and frame.shape[2] == 1
-        else:
-            raise Exception(f"invalid frame ndarray ndim: {frame.ndim}")
-        height, width, channels = frame.shape
-        aspect_ratio = width / height
-        if aspect_ratio != OPTIMAL_ASPECT_RATIO:
+        with _BARS_LOCK:   # <-- `final_frame` may be the shared `_BARS_BUFFER`
             final_frame = _add_white_bars(frame)
             height, width, channels = final_frame.shape
-        else:
-            final_frame = frame
-        shape = [width, height, channels]
-        rect = [0, 0, 0, 0]
-        console.stream_image(rect, shape, final_frame.tobytes())
+            shape = (width, height, channels)
+            # The RPC layer (msgpack) packs any buffer, so we pass a view rather than a `tobytes()` copy.
+            console.stream_image(_FULLSCREEN_RECT, shape, memoryview(np.ascontiguousarray(final_frame)))
 
-    # Encode the frame and publish to the network connection.
+    # Encode the frame and publish to the network connection (in the background).
     if to_labs:
-        base64_img = base64_encode_image(frame)
-        send_message_to_labs({'base64_img': base64_img})
+        _send_to_labs(frame.copy())   # <-- copy, since the caller may reuse `frame`
 
     if verbose:
         h, w = frame.shape[:2]
         _ctx_print_all("Streamed frame of size {}x{}.".format(w, h))
 
 
+def _send_to_labs(frame):
+    """
+    Queue `frame` (or None, to clear the image) to be encoded and sent to Labs
+    by the background worker. Only the latest queued frame is kept: if the
+    worker is still busy with an earlier frame, any frame which was waiting
+    behind it is dropped in favor of this one.
+    """
+    global _LABS_INFLIGHT, _LABS_PENDING
+    with _LABS_LOCK:
+        _LABS_PENDING = (frame,)
+        if _LABS_INFLIGHT is None:
+            _LABS_INFLIGHT = _LABS_EXECUTOR.submit(_labs_worker)
+
+
+def _labs_worker():
+    global _LABS_INFLIGHT, _LABS_PENDING
+    while True:
+        with _LABS_LOCK:
+            pending = _LABS_PENDING
+            _LABS_PENDING = None
+            if pending is None:
+                _LABS_INFLIGHT = None
+                return
+        frame, = pending
+        try:
+            base64_img = '' if frame is None else base64_encode_image(frame)
+            send_message_to_labs({'base64_img': base64_img})   # <-- False just means we aren't connected to Labs
+        except Exception:
+            # `stream()` has already returned, so this is the only place the error
+            # can go; log it and keep going with the next frame.
+            log.exception("Failed to send a frame to Labs.")
+
+
 def _add_white_bars(frame):
     """
     This function is intended for a wide image that needs white bars
@@ -192,16 +256,22 @@ def _add_white_bars(frame):
     Args:
         frame: nd-array (height, width, channels)
 
-    Returns: nd-array (height, width, channels) with the OPTIMAL_ASPECT_RATIO
+    Returns: nd-array (height, width, channels) with the OPTIMAL_ASPECT_RATIO;
+             this is `frame` itself if no bars are needed, else it is the
+             `_BARS_BUFFER`, which is overwritten by the next call
     """
+    global _BARS_BUFFER
     height, width, channels = frame.shape
-    aspect_ratio = width / height
-    if aspect_ratio > OPTIMAL_ASPECT_RATIO:
-        # add horizontal bars
-        bar_height = int(((width / OPTIMAL_ASPECT_RATIO) - height )/ 2)
-        bar = np.ones((bar_height, width, channels), dtype=frame.dtype) * 255
-        frame = np.vstack((bar, frame, bar))
-    else:
-        # add vertical bars
-        pass
-    return frame
+    bar_height = int(((width / OPTIMAL_ASPECT_RATIO) - height )/ 2)
+    if bar_height <= 0:
+        # The frame is (near enough) the optimal aspect ratio, or is taller
+        # than it, in which case it would need vertical bars; we don't add those.
+        return frame
+    # Camera frames are all the same size, so the same buffer serves every
+    # frame; its bars are painted white just once, when it's allocated.
+    out_shape = (height + 2 * bar_height, width, channels)
+    out = _BARS_BUFFER
+    if out is None or out.shape != out_shape or out.dtype != frame.dtype:
+        out = _BARS_BUFFER = np.full(out_shape, 255, dtype=frame.dtype)
+    out[bar_height:bar_height+height] = frame
+    return out
@@ -16,19 +16,53 @@ This is a **synchronous** interface.
 """
 
 import subprocess
+import functools
+import shutil
 import socket
 import fcntl
 import struct
+import array
 import time
 import requests
 import re
 import os
+from threading import Lock
 
 
 PING_PROTO = os.environ.get('MAI_PING_PROTO', 'https')
 PING_HOST  = os.environ.get('MAI_PING_HOST', 'ws.autoauto.ai')
 
 
+# The (constant) argv of each command we run; see `_run_cmd()`.
+_NMCLI_WIFI_CONNECT = ('nmcli', 'dev', 'wifi', 'connect')
+_NMCLI_DEV_LIST = ('nmcli', '--terse', '--fields', 'DEVICE,TYPE,CONNECTION', 'dev')
+_NMCLI_CON_SHOW = ('nmcli', '--terse', '--fields', 'UUID,NAME,TYPE', 'con', 'show')
+_NMCLI_CON_DELETE = ('nmcli', 'con', 'delete')
+_NMCLI_RADIO_WIFI = ('nmcli', 'radio', 'wifi')
+_NMCLI_RADIO_WIFI_ON = ('nmcli', 'radio', 'wifi', 'on')
+_NMCLI_RADIO_WIFI_OFF = ('nmcli', 'radio', 'wifi', 'off')
+_IP_LINK_SHOW_UP = ('ip', 'link', 'show', 'up')
+
+# Patterns for parsing the output of `ip link show`.
+_IP_LINK_IFACE_RE = re.compile(r'^\d+: ([^:@]+)', re.MULTILINE)
+_IP_LINK_ETHER_RE = re.compile(r'ether ([^ ]+)')
+
+# Matches each line of `nmcli --terse` output which has exactly three fields.
+# In terse mode nmcli escapes a `:` (or `\`) within a field with a backslash,
+# so only unescaped colons separate fields; see `_nmcli_3_fields()`.
+_NMCLI_FIELD = r'((?:[^:\\\n]|\\.)*)'
+_NMCLI_3_FIELDS_RE = re.compile(rf'^{_NMCLI_FIELD}:{_NMCLI_FIELD}:{_NMCLI_FIELD}$', re.MULTILINE)
+_NMCLI_ESCAPE_RE = re.compile(r'\\(.)')
+
+# How long (in seconds) the `nmcli` device listing may be reused, so that
+# back-to-back queries (and bursts of polling) don't each fork `nmcli`.
+# See `_nmcli_devices()`. Set to 0 to disable.
+NMCLI_CACHE_TTL = 0.5
+
+_NMCLI_CACHE_LOCK = Lock()
+_NMCLI_DEVICES_CACHE = None   # <-- (timestamp, devices) of the last listing
+
+
 class Wireless:
     """
     Simple python interface to the `nmcli` utility.
@@ -46,8 +80,8 @@ class Wireless:
     def connect(self, ssid, password):
         self.delete_connection(ssid)
 
-        response = _run_cmd("nmcli dev wifi connect".split(' ') +
-                            [ssid, 'password', password, 'ifname', self.interface,
+        response = _run_cmd([*_NMCLI_WIFI_CONNECT,
+                             ssid, 'password', password, 'ifname', self.interface,
                              'name', ssid])   # , 'hidden', 'yes'
 
         did_connect = not self._error_in_response(response)
@@ -59,16 +93,12 @@ class Wireless:
 
         os.sync()
 
+        _invalidate_nmcli_devices()   # <-- the connection changed (or may have)
+        _reset_ping_session()
         return did_connect
 
     def current(self):
-        response = _run_cmd("nmcli --terse --field DEVICE,CONNECTION dev".split(' '))
-
-        for line in response.splitlines():
-            lst = line.split(':')
-            if len(lst) != 2:
-                continue
-            iface, name = lst
+        for iface, _, name in _nmcli_devices():
             if iface == self.interface:
                 if name in ('', '--'):
                     return None
@@ -77,106 +107,218 @@ class Wireless:
         return None
 
     def delete_connection(self, ssid_to_delete):
-        response = _run_cmd("nmcli --terse --fields UUID,NAME,TYPE con show".split(' '))
+        response = _run_cmd(_NMCLI_CON_SHOW)
 
-        for line in response.splitlines():
-            lst = line.split(':')
-            if len(lst) != 3:
-                continue
-            uuid, name, type_ = lst
+        # Gather every matching connection so they can all be deleted by a single `nmcli`.
+        to_delete = []
+        for uuid, name, type_ in _nmcli_3_fields(response):
             if type_ == '802-11-wireless' and ssid_to_delete in name:
-                _run_cmd("nmcli con delete uuid".split(' ') + [uuid])
+                to_delete.extend(('uuid', uuid))
+
+        if to_delete:
+            _run_cmd([*_NMCLI_CON_DELETE, *to_delete])
+
+        _invalidate_nmcli_devices()
+        _reset_ping_session()
 
     def radio_power(self, on=None):
         if on is True:
-            _run_cmd('nmcli radio wifi on'.split(' '))
+            _run_cmd(_NMCLI_RADIO_WIFI_ON)
+            _invalidate_nmcli_devices()
         elif on is False:
-            _run_cmd('nmcli radio wifi off'.split(' '))
+            _run_cmd(_NMCLI_RADIO_WIFI_OFF)
+            _invalidate_nmcli_devices()
         else:
-            response = _run_cmd('nmcli radio wifi'.split(' '))
+            response = _run_cmd(_NMCLI_RADIO_WIFI)
             return 'enabled' in response
 
 
 def get_ip_address(ifname):
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        ret = socket.inet_ntoa(fcntl.ioctl(
-            s.fileno(),
+        return socket.inet_ntoa(fcntl.ioctl(
+            _ioctl_socket().fileno(),
             0x8915,  # SIOCGIFADDR
-            struct.pack('256s', ifname[:15].encode('utf-8'))
+            struct.pack('40s', ifname[:15].encode('utf-8'))   # <-- a `struct ifreq`
         )[20:24])
-        s.close()
-        return ret
-    except:
-        # Humm...
+    except OSError:
+        # No such interface, or it has no IPv4 address.
         return None
 
 
+def get_all_ip_addresses():
+    """
+    Return a dict mapping each interface name to its IPv4 address, for every
+    interface which has one. This costs a single ioctl, rather than one per
+    interface as calling `get_ip_address()` for each would.
+    """
+    ifreq_size = 40 if struct.calcsize('P') == 8 else 32   # <-- sizeof(struct ifreq)
+    max_ifaces = 32
+    while True:
+        buf = array.array('B', bytes(ifreq_size * max_ifaces))
+        buf_addr, _ = buf.buffer_info()
+        ifconf = fcntl.ioctl(
+            _ioctl_socket().fileno(),
+            0x8912,  # SIOCGIFCONF
+            struct.pack('iP', len(buf), buf_addr)   # <-- a `struct ifconf`
+        )
+        length = struct.unpack('iP', ifconf)[0]
+        if length < len(buf):
+            break
+        max_ifaces *= 2   # <-- the buffer filled up, so there may be more; retry with more room
+    data = buf.tobytes()[:length]
+    return {
+        data[i:i+16].split(b'\0', 1)[0].decode('utf-8'): socket.inet_ntoa(data[i+20:i+24])
+        for i in range(0, length, ifreq_size)
+    }
+
+
+_IOCTL_SOCKET_LOCK = Lock()
+_IOCTL_SOCKET = None
+
+
+def _ioctl_socket():
+    # One socket serves every `get_ip_address()` call (rather than opening and
+    # closing one per call); concurrent ioctls on it are fine.
+    global _IOCTL_SOCKET
+    with _IOCTL_SOCKET_LOCK:
+        if _IOCTL_SOCKET is None:
+            _IOCTL_SOCKET = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return _IOCTL_SOCKET
+
+
 def get_mac_address(ifname):
+    try:
+        # Read straight from sysfs rather than forking `ip link show`.
+        if _read_sysfs_net(ifname, 'type') != '1':   # <-- only ethernet-like links (ARPHRD_ETHER, which includes wifi)
+            return None
+        return _read_sysfs_net(ifname, 'address')
+    except OSError:
+        pass
     output = _run_cmd(['ip', 'link', 'show', 'dev', ifname])
-    match = re.search(r'ether ([^ ]+)', output)
+    match = _IP_LINK_ETHER_RE.search(output)
     if match is not None:
         return match.group(1)
 
 
 def has_internet_access():
     try:
-        # Consider instead: https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.getaddrinfo
-        params = socket.getaddrinfo(PING_HOST, PING_PROTO, proto=socket.IPPROTO_TCP)[0]
-    except:
-        return False
-    family, type_, proto = params[:3]
-    sockaddr = params[4]
-    sock = socket.socket(family, type_, proto)
-    sock.settimeout(20.0)
-    try:
-        sock.connect(sockaddr)   # <-- blocking, but respects the `settimeout()` call above
-    except (socket.timeout, OSError):
-        sock.close()
-        return False
-    sock.close()
-    try:
-        req = requests.get(f'{PING_PROTO}://{PING_HOST}/ping', timeout=80.0)
+        # The connect timeout (20s) bounds an unreachable host on its own, so there's
+        # no need for a separate TCP pre-connect (and DNS lookup) before the request.
+        req = _ping_session().get(f'{PING_PROTO}://{PING_HOST}/ping', timeout=(20.0, 80.0))
         data = req.json()
-        return req.status_code == 200 and data['text'] == 'pong'
+        if req.status_code == 200 and data['text'] == 'pong':
+            return True
     except:
-        return False
+        pass
+    _reset_ping_session()   # <-- don't reuse a connection which may be the cause of the failure
+    return False
+
+
+_PING_SESSION_LOCK = Lock()
+_PING_SESSION = None
+
+
+def _ping_session():
+    # A long-lived session keeps the connection to PING_HOST alive between
+    # checks, so repeated checks skip the DNS lookup and the TCP/TLS handshakes.
+    global _PING_SESSION
+    with _PING_SESSION_LOCK:
+        if _PING_SESSION is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _PING_SESSION = session
+        return _PING_SESSION
+
+
+def _reset_ping_session():
+    # Drop the kept-alive connection(s), e.g. after switching networks, where
+    # a pooled socket may be half-open and would otherwise stall the next check.
+    global _PING_SESSION
+    with _PING_SESSION_LOCK:
+        session, _PING_SESSION = _PING_SESSION, None
+    if session is not None:
+        session.close()
 
 
 def list_ifaces():
-    response = _run_cmd('ip link show up'.split(' '))
+    try:
+        # Ask the kernel directly (no fork of `ip link show up`); same order as `ip` (by index).
+        return [iface for _, iface in socket.if_nameindex()
+                if int(_read_sysfs_net(iface, 'flags'), 16) & 0x1]   # <-- IFF_UP
+    except OSError:
+        pass
 
-    interfaces = []
-    for line in response.splitlines():
-        match = re.search(r'^\d+: ([^:@]+)', line)
-        if match is not None:
-            iface = match[1]
-            interfaces.append(iface)
+    response = _run_cmd(_IP_LINK_SHOW_UP)
 
-    return interfaces
+    return _IP_LINK_IFACE_RE.findall(response)
 
 
 def list_wifi_ifaces():
+    if not _has_nmcli():
+        # nmcli not installed on this system -- assume no wifi in this case
+        return []
     try:
-        response = _run_cmd('nmcli --terse --fields DEVICE,TYPE dev'.split(' '))
+        devices = _nmcli_devices()
     except FileNotFoundError:
-        # nmcli not installed on this system -- assume no wifi in this case
         return []
 
-    interfaces = []
-    for line in response.splitlines():
-        lst = line.split(':')
-        if len(lst) != 2:
-            continue
-        iface, type_ = lst
-        if type_ == 'wifi':
-            interfaces.append(iface)
+    return [iface for iface, type_, _ in devices if type_ == 'wifi']
+
+
+def _nmcli_devices():
+    """
+    Return a list of `(device, type, connection)` tuples, one for each device
+    known to NetworkManager. One `nmcli` listing serves both `list_wifi_ifaces()`
+    and `Wireless.current()`, and it is reused for up to `NMCLI_CACHE_TTL` seconds.
+    """
+    global _NMCLI_DEVICES_CACHE
+    with _NMCLI_CACHE_LOCK:   # <-- concurrent callers wait for (and share) one listing
+        cache = _NMCLI_DEVICES_CACHE
+        now = time.monotonic()
+        if cache is not None and now - cache[0] < NMCLI_CACHE_TTL:
+            return cache[1]
+
+        response = _run_cmd(_NMCLI_DEV_LIST)
+
+        devices = _nmcli_3_fields(response)
+
+        _NMCLI_DEVICES_CACHE = (now, devices)
+        return devices
+
+
+def _nmcli_3_fields(response):
+    """
+    Parse `nmcli --terse` output into a list of `(field, field, field)` tuples,
+    one for each line which has exactly three fields, with nmcli's escaping undone.
+    """
+    rows = _NMCLI_3_FIELDS_RE.findall(response)
+    if '\\' not in response:
+        return rows   # <-- nothing is escaped (the usual case)
+    return [tuple(_NMCLI_ESCAPE_RE.sub(r'\1', field) for field in row) for row in rows]
+
+
+def _invalidate_nmcli_devices():
+    global _NMCLI_DEVICES_CACHE
+    with _NMCLI_CACHE_LOCK:
+        _NMCLI_DEVICES_CACHE = None
+
+
+@functools.lru_cache(maxsize=1)
+def _has_nmcli():
+    # Looked up once (a scan of PATH, no fork); nmcli won't come or go while we run.
+    return shutil.which('nmcli') is not None
+
 
-    return interfaces
+def _read_sysfs_net(ifname, attr):
+    with open(os.path.join('/sys/class/net', ifname, attr)) as f:
+        return f.read().strip()
 
 
 def _run_cmd(cmd):
     output = subprocess.run(cmd,
+                            stdin=subprocess.DEVNULL,   # <-- never let a command (e.g. nmcli asking for secrets) block on our stdin
                             stdout=subprocess.PIPE,
                             stderr=subprocess.STDOUT).stdout.decode('utf-8')
     return output
@@ -187,8 +329,9 @@ if __name__ == '__main__':
     all_ifaces = list_ifaces()
     wifi_ifaces = list_wifi_ifaces()
 
+    ip_addresses = get_all_ip_addresses()
     for iface in all_ifaces:
-        print(iface, get_ip_address(iface))
+        print(iface, ip_addresses.get(iface))
 
     wireless = Wireless(wifi_ifaces[0])
     print('WiFi interface', wireless.interface)
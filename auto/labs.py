@@ -15,7 +15,6 @@ This is a **synchronous** interface.
 """
 
 import os
-from threading import Lock
 
 from auto.asyncio_tools import get_loop, thread_safe
 from auto.services.labs.rpc.client_sync import LabsService
@@ -51,17 +50,22 @@ send = send_message_to_labs
 receive = receive_message_from_labs
 
 
-_GLOBAL_LOCK = Lock()
+_CLIENT = None
 
 
-@thread_safe
 def _global_client():
+    client = _CLIENT
+    if client is None:
+        client = _init_client()
+    return client
+
+
+@thread_safe
+def _init_client():
     global _CLIENT
-    with _GLOBAL_LOCK:
-        try:
-            _CLIENT
-        except NameError:
-            _CLIENT = LabsService(get_loop())
-            _CLIENT.connect()
-        return _CLIENT
+    if _CLIENT is None:
+        client = LabsService(get_loop())
+        client.connect()
+        _CLIENT = client   # <-- only publish it once it's connected, since `_global_client()` doesn't take the lock
+    return _CLIENT
 
@@ -31,6 +31,8 @@ def led_map():
 def set_led(led_identifier, val):
     """
     Set the LED on/off value.
+    (To set several LEDs at once, use `set_many_leds()`,
+    which does it in a single round-trip to the controller.)
     """
     return _get_leds().set_led(led_identifier, val)
 
@@ -70,12 +72,20 @@ def set_brightness(brightness):
     return _get_leds().set_brightness(brightness)
 
 
-@thread_safe
+_LEDs = None
+
+
 def _get_leds():
+    leds = _LEDs
+    if leds is None:
+        leds = _init_leds()
+    return leds
+
+
+@thread_safe
+def _init_leds():
     global _LEDs
-    try:
-        _LEDs
-    except NameError:
+    if _LEDs is None:
         caps = list_caps()
         if 'LEDs' not in caps:
             raise AttributeError("This device does not have LEDs.")
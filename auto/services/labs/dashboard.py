@@ -48,6 +48,7 @@ class Dashboard:
 
     async def connected_cdp(self):
         self.known_user_sessions = set()
+        await self._stop_all_capture_streams()
 
     async def new_device_session(self, vin):
         pass
@@ -117,6 +118,8 @@ class Dashboard:
 
     async def disconnected_cdp(self):
         self.known_user_sessions = set()
+        # No one can receive these frames now, so stop capturing and encoding them.
+        await self._stop_all_capture_streams()
 
     async def _query(self, components, query_id, user_session, send_func):
         response = {}
@@ -235,8 +238,7 @@ class Dashboard:
                 for index in itertools.count():
                     buf, shape = await self.camera.capture()
                     frame = np.frombuffer(buf, dtype=np.uint8).reshape(shape)
-                    await loop.run_in_executor(None, draw_frame_index, frame, index)
-                    base64_img = await loop.run_in_executor(None, base64_encode_image, frame)
+                    base64_img = await loop.run_in_executor(None, _draw_index_and_encode, frame, index)
                     await send_func({
                         'type': 'command_response_async',
                         'command_id': command_id,
@@ -259,6 +261,10 @@ class Dashboard:
         await task
         return True
 
+    async def _stop_all_capture_streams(self):
+        for user_session in list(self.capture_streams):  # copy keys
+            await self._stop_capture_stream(user_session)
+
     async def _get_cio_version(self):
         cio_version_iface = await self.controller.acquire('VersionInfo')
         cio_version = await cio_version_iface.version()
@@ -273,3 +279,9 @@ class Dashboard:
             'percentage': percentage,
         }
 
+
+
+def _draw_index_and_encode(frame, index):
+    # Done together so each streamed frame costs one executor round trip, not two.
+    draw_frame_index(frame, index)
+    return base64_encode_image(frame)
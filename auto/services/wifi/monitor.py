@@ -59,7 +59,7 @@ async def _stream_frame(frame, console):
         return  # :(
     shape = [width, height, channels]
     rect = [22, 20, width, height]
-    await console.stream_image(rect, shape, frame.tobytes())
+    await console.stream_image(rect, shape, memoryview(np.ascontiguousarray(frame)))   # <-- no `tobytes()` copy
 
 
 async def _current(wireless):
@@ -18,6 +18,7 @@ This is a **synchronous** interface.
 from picamera import PiCamera
 from picamera.array import PiRGBArray
 import numpy as np
+import weakref
 import time
 
 
@@ -40,6 +41,7 @@ class CameraRGB:
         """
         self.camera = PiCamera(resolution=(width, height), framerate=fps)
         self.array = PiRGBArray(self.camera, size=(width, height))
+        self._finalizer = weakref.finalize(self, self.camera.close)
         time.sleep(1.0)
 
     def capture(self):
@@ -65,13 +67,7 @@ class CameraRGB:
 
     def close(self):
         """
-        Release the resources held by this camera object.
+        Release the resources held by this camera object. This is also done
+        automatically (at most once) when this object is garbage collected.
         """
-        self.camera.close()
-
-    def __del__(self):
-        """
-        Python destructor which calls `close()` on this object.
-        """
-        self.close()
-
+        self._finalizer()
@@ -240,12 +240,10 @@ def stream_image(rect_vals, shape, image_buf):
     if rect_vals == (0, 0, 0, 0):  # <-- sentinel value to mean the full screen
         stream_img_rect = full_rect
     if channels == 1:
-        data2 = np.fromstring(image_buf, dtype=np.uint8).reshape((height, width))
-        data = np.zeros((height, width, 3), dtype=np.uint8)
-        data[:,:,0] = data2
-        data[:,:,1] = data2
-        data[:,:,2] = data2
-        data = data.tobytes()
+        # `frombuffer` views `image_buf` in place, and `repeat` expands the gray
+        # to RGB in a single pass (rather than zero-filling and three writes).
+        data2 = np.frombuffer(image_buf, dtype=np.uint8).reshape((height, width, 1))
+        data = np.repeat(data2, 3, axis=2).tobytes()
     else:   # channels == 3
         data = image_buf  # the `image_buf` is already bytes
     stream_img = pygame.image.fromstring(data, (width, height), 'RGB')